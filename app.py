@@ -5,32 +5,30 @@
 指定された文字数（5字または7字）で整形し、DTP処理に適した形式で出力します。
 """
 
+import hashlib
+import io
 import os
-from typing import List, Optional, Set, Tuple
+import re
+from typing import Any, Dict, List
 
 import pandas as pd
 import streamlit as st
 
 # 自作モジュールのインポート
-from pattern5 import format_name_5chars_rule
-from pattern7 import format_name_7chars_rule
+from core import (
+    build_surname_trie,
+    column_to_names,
+    prepare_surnames,
+    process_names,
+    read_csv_bytes,
+)
 
 # --- 定数 ---
 DEFAULT_SURNAME_FILE = "surnames.txt"
 BACKUP_SURNAME_FILE = "苗字リスト.txt"
+NAME_COLUMN_PATTERN = re.compile(r"氏名|名前|姓名|name", re.IGNORECASE)
 
-
-def init_page():
-    """ページ初期設定"""
-    st.set_page_config(
-        page_title="日本語DTP字取りツール",
-        page_icon="📝",
-        layout="centered",  # 1カラムのシンプルなレイアウト
-    )
-
-    # CSSスタイルの追加
-    st.markdown(
-        """
+CUSTOM_CSS = """
     <style>
         /* メイン背景とフォント */
         .stApp {
@@ -113,10 +111,20 @@ def init_page():
             }
         }
     </script>
-    """,
-        unsafe_allow_html=True,
+    """
+
+
+def init_page():
+    """ページ初期設定"""
+    st.set_page_config(
+        page_title="日本語DTP字取りツール",
+        page_icon="📝",
+        layout="centered",  # 1カラムのシンプルなレイアウト
     )
 
+    # CSSスタイルの追加（再実行のたびに描画し直す必要があるため毎回出力する）
+    st.markdown(CUSTOM_CSS, unsafe_allow_html=True)
+
 
 @st.cache_data
 def load_default_surname_list() -> List[str]:
@@ -137,9 +145,7 @@ def load_default_surname_list() -> List[str]:
                 with open(filename, encoding=enc) as f:
                     surnames = [line.strip() for line in f if line.strip()]
                 if surnames:
-                    # 長い順にソートして最長一致を実現
-                    surnames.sort(key=len, reverse=True)
-                    return surnames
+                    return prepare_surnames(surnames)
             except UnicodeDecodeError:
                 continue
     except Exception:
@@ -147,112 +153,34 @@ def load_default_surname_list() -> List[str]:
     return []
 
 
-def load_custom_surname_list(uploaded_file) -> List[str]:
-    """アップロードされた苗字リストを読み込む"""
-    try:
-        content = uploaded_file.getvalue()
-        for enc in ["utf-8", "shift-jis", "cp932"]:
-            try:
-                text = content.decode(enc)
-                surnames = [line.strip() for line in text.splitlines() if line.strip()]
-                if surnames:
-                    surnames.sort(key=len, reverse=True)
-                    return surnames
-            except UnicodeDecodeError:
-                continue
-    except Exception as e:
-        st.error(f"苗字リストの読み取りに失敗しました: {e}")
+@st.cache_data(show_spinner=False, max_entries=4)
+def load_custom_surname_list(content: bytes) -> List[str]:
+    """
+    アップロードされた苗字リストを読み込む（ファイル内容をキーにキャッシュ）
+
+    エラー表示がキャッシュから再生されないよう、例外は呼び出し側で扱う。
+    """
+    for enc in ["utf-8", "shift-jis", "cp932"]:
+        try:
+            # 全体を一度に文字列化せず、行単位でデコードする
+            with io.TextIOWrapper(io.BytesIO(content), encoding=enc) as f:
+                surnames = [line.strip() for line in f if line.strip()]
+            if surnames:
+                return prepare_surnames(surnames)
+        except UnicodeDecodeError:
+            continue
     return []
 
 
-def split_name_smart(
-    full_name: str, surname_set: Set[str], max_surname_len: int
-) -> Tuple[Optional[str], Optional[str]]:
-    """最長一致で苗字と名前に分割する"""
-    for length in range(min(len(full_name), max_surname_len), 0, -1):
-        potential_surname = full_name[:length]
-        if potential_surname in surname_set:
-            return potential_surname, full_name[length:]
-    return None, None
-
+@st.cache_resource(show_spinner=False, max_entries=4)
+def load_surname_trie(source_key: str, _surname_list: List[str]) -> Dict[str, Any]:
+    """
+    苗字リストのトライ木を取得する（サーバープロセス内で共有キャッシュ）
 
-def process_names(names: List[str], surname_list: List[str], target_length: int, use_multiline: bool = False):
-    """名前リストを処理する"""
-    surname_set = set(surname_list)
-    max_surname_len = max(len(s) for s in surname_list) if surname_list else 0
-
-    formatted_names = []
-    skipped_names = []
-
-    progress_bar = st.progress(0)
-    total = len(names)
-
-    for i, full_name in enumerate(names):
-        full_name_str = str(full_name).strip()
-        if not full_name_str:
-            formatted_names.append("")
-            continue
-
-        # 改行位置の保存とクリーンアップ
-        original_name = str(full_name)
-        if use_multiline and "\n" in original_name:
-            # 各文字の直後に改行があるかどうかのフラグを作成
-            # 文字単位で処理するためにリストにする
-            chars = []
-            newlines_after = [] # 各文字のインデックスの後に改行がいくつあるか
-            
-            current_newlines = 0
-            for char in full_name:
-                if char == "\n":
-                    if chars:
-                        newlines_after[-1] += 1
-                    else:
-                        # 先頭に改行がある場合
-                        current_newlines += 1
-                else:
-                    chars.append(char)
-                    newlines_after.append(0)
-            
-            clean_name = "".join(chars)
-            prefix_newlines = "\n" * current_newlines
-        else:
-            clean_name = full_name
-            prefix_newlines = ""
-            newlines_after = []
-
-        surname, given_name = split_name_smart(clean_name, surname_set, max_surname_len)
-
-        if surname is None:
-            skipped_names.append((i + 1, original_name))
-            formatted_names.append(original_name)
-        else:
-            fmt_func = (
-                format_name_5chars_rule
-                if target_length == 5
-                else format_name_7chars_rule
-            )
-            formatted = fmt_func(surname, given_name)
-            
-            # 改行の再挿入
-            if use_multiline and newlines_after:
-                res = prefix_newlines
-                char_idx = 0
-                for char in formatted:
-                    res += char
-                    # 空白以外の文字（元の名前に含まれていた文字）の場合、
-                    # 元の文字列でその文字の後にあった改行を挿入
-                    if char != "　" and char != " ":
-                        if char_idx < len(newlines_after):
-                            res += "\n" * newlines_after[char_idx]
-                            char_idx += 1
-                formatted = res
-                
-            formatted_names.append(formatted)
-
-        if (i + 1) % 10 == 0 or (i + 1) == total:
-            progress_bar.progress((i + 1) / total)
-
-    return formatted_names, skipped_names
+    リスト自体のハッシュ計算は構築より重いため、キャッシュのキーには
+    リストの出所を表す source_key だけを使う（_ 始まりの引数はキーから外れる）。
+    """
+    return build_surname_trie(_surname_list)
 
 
 def main():
@@ -301,23 +229,29 @@ def main():
         if uploaded_data:
             try:
                 if uploaded_data.name.endswith(".csv"):
-                    # 文字コード判定
-                    content = uploaded_data.read()
-                    df = None
-                    for enc in ["utf-8", "shift-jis", "cp932"]:
-                        try:
-                            df = pd.read_csv(pd.io.common.BytesIO(content), encoding=enc)
-                            break
-                        except Exception:
-                            continue
+                    df = read_csv_bytes(uploaded_data.read())
                 else:
-                    df = pd.read_excel(uploaded_data)
+                    df = pd.read_excel(
+                        uploaded_data, engine="calamine", dtype_backend="pyarrow"
+                    )
 
                 if df is not None:
                     st.dataframe(df.head(3), use_container_width=True)
-                    target_col = st.selectbox("氏名が含まれる列を選択:", df.columns)
+                    # 氏名らしい列があれば初期選択にする
+                    name_col_idx = next(
+                        (
+                            idx
+                            for idx, col in enumerate(df.columns)
+                            if NAME_COLUMN_PATTERN.search(str(col))
+                        ),
+                        0,
+                    )
+                    target_col = st.selectbox(
+                        "氏名が含まれる列を選択:", df.columns, index=name_col_idx
+                    )
                     if target_col:
-                        name_list = df[target_col].dropna().astype(str).tolist()
+                        # 空セルは空文字にし、結果でも空行として残す
+                        name_list = column_to_names(df[target_col])
                 else:
                     st.error("ファイルの読み込みに失敗しました。")
             except Exception as e:
@@ -332,24 +266,37 @@ def main():
     st.markdown('<div id="scroll-target"></div>', unsafe_allow_html=True)
     st.markdown('<h2 class="sub-header">3. 実行と結果</h2>', unsafe_allow_html=True)
 
-    if not name_list:
+    # 空行は結果でも維持するが、値のあるセルが一つもなければ処理しない
+    if not any(name.strip() for name in name_list):
         st.warning("名前リストが空です。")
     else:
         if st.button("🚀 処理を実行する", use_container_width=True, type="primary"):
             # 苗字リスト準備
             with st.spinner("準備中..."):
                 if custom_surname_file:
-                    surname_list = load_custom_surname_list(custom_surname_file)
+                    content = custom_surname_file.getvalue()
+                    try:
+                        surname_list = load_custom_surname_list(content)
+                    except Exception as e:
+                        st.error(f"苗字リストの読み取りに失敗しました: {e}")
+                        surname_list = []
+                    surname_source = hashlib.sha256(content).hexdigest()
                 else:
                     surname_list = load_default_surname_list()
+                    surname_source = DEFAULT_SURNAME_FILE
 
             if not surname_list:
                 st.error("苗字リストを読み込めませんでした。")
             else:
                 # 処理
                 with st.spinner("変換中..."):
+                    progress_bar = st.progress(0)
                     formatted, skipped = process_names(
-                        name_list, surname_list, target_len, use_multiline
+                        name_list,
+                        load_surname_trie(surname_source, surname_list),
+                        target_len,
+                        use_multiline,
+                        on_progress=progress_bar.progress,
                     )
 
                 st.success(f"完了! (全 {len(formatted)} 件)")
@@ -369,8 +316,11 @@ def main():
 
                 if skipped:
                     with st.expander(f"⚠️ 判定できなかった名前 ({len(skipped)}件)"):
-                        for line_no, name in skipped:
-                            st.write(f"- {line_no}行目: {name}")
+                        st.markdown(
+                            "\n".join(
+                                f"- {line_no}行目: {name}" for line_no, name in skipped
+                            )
+                        )
 
     # フッター
     st.markdown(
@@ -0,0 +1,200 @@
+"""
+苗字判定・整形の共通処理モジュール
+
+このモジュールは、Streamlitに依存しない苗字リストの前処理、CSVの読み込み、
+表の列から名前リストへの変換、最長一致による氏名の分割、字取りルールの呼び分け、
+名前リストの一括処理を提供します。
+"""
+
+import functools
+import io
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+
+from pattern5 import format_name_5chars_rule
+from pattern7 import format_name_7chars_rule
+
+# --- 定数 ---
+CSV_ENCODINGS = ["utf-8", "shift-jis", "cp932"]
+TRIE_TERMINAL = ""  # トライ木の終端キー（1文字のキーと衝突しない）
+
+# 目標文字数 -> 字取りルール関数
+# 字取りルールは純粋関数のため、同姓同名の再計算を避けるようキャッシュする
+FORMAT_RULES: Dict[int, Callable[[str, str], str]] = {
+    5: functools.lru_cache(maxsize=65536)(format_name_5chars_rule),
+    7: functools.lru_cache(maxsize=65536)(format_name_7chars_rule),
+}
+
+
+def prepare_surnames(surnames: List[str]) -> List[str]:
+    """重複を除き、長い順（同じ長さは辞書順）に並べた苗字リストを返す"""
+    return sorted(set(surnames), key=lambda s: (-len(s), s))
+
+
+def read_csv_bytes(content: bytes) -> Optional[pd.DataFrame]:
+    """CSVのバイト列を読み込む（UTF-8, Shift-JIS, CP932を順に試す）"""
+    for enc in CSV_ENCODINGS:
+        # pyarrowはデコードできない列をエラーにせずbinary型で返すため、
+        # 文字コードの判定は自前のデコードで行い、UTF-8にしてから渡す
+        try:
+            text = content.decode(enc)
+        except UnicodeDecodeError:
+            continue
+        try:
+            df = pd.read_csv(
+                io.BytesIO(text.encode("utf-8")),
+                engine="pyarrow",
+                dtype_backend="pyarrow",
+            )
+        except Exception:
+            continue
+        # pyarrowは重複した列名をそのまま残すため、Cエンジンと同じく連番を付ける
+        df.columns = dedup_column_names(df.columns)
+        return df
+    return None
+
+
+def dedup_column_names(columns: Iterable[Any]) -> List[Any]:
+    """重複した列名に .1, .2 … を付けて一意にする（pandasの read_csv と同じ命名）"""
+    counts: Dict[Any, int] = {}
+    result = []
+    for col in columns:
+        cur_count = counts.get(col, 0)
+        while cur_count > 0:
+            counts[col] = cur_count + 1
+            col = f"{col}.{cur_count}"
+            cur_count = counts.get(col, 0)
+        result.append(col)
+        counts[col] = cur_count + 1
+    return result
+
+
+def column_to_names(column: pd.Series) -> List[str]:
+    """表の列を名前リストに変換する（空セルは空文字にして行の位置を保つ）"""
+    # astype(str) では pandas 2.x で欠損を含む整数列が "1.0" や "nan" になるため、
+    # 文字列型に変換してから欠損を埋める
+    return column.astype("string").fillna("").tolist()
+
+
+def build_surname_trie(surname_list: List[str]) -> Dict[str, Any]:
+    """苗字リストからトライ木を構築する"""
+    trie: Dict[str, Any] = {}
+    for surname in surname_list:
+        node = trie
+        for char in surname:
+            node = node.setdefault(char, {})
+        node[TRIE_TERMINAL] = surname
+    return trie
+
+
+def split_name_smart(
+    full_name: str, surname_trie: Dict[str, Any]
+) -> Tuple[Optional[str], Optional[str]]:
+    """トライ木を先頭から辿り、最長一致で苗字と名前に分割する"""
+    node = surname_trie
+    match_end = 0
+    for idx, char in enumerate(full_name):
+        node = node.get(char)
+        if node is None:
+            break
+        if TRIE_TERMINAL in node:
+            match_end = idx + 1
+
+    if match_end == 0:
+        return None, None
+    return full_name[:match_end], full_name[match_end:]
+
+
+def get_format_rule(target_length: int) -> Callable[[str, str], str]:
+    """目標文字数に対応する字取りルール関数を返す（ループの外で一度だけ呼ぶ）"""
+    return FORMAT_RULES[target_length]
+
+
+def process_names(
+    names: List[str],
+    surname_trie: Dict[str, Any],
+    target_length: int,
+    use_multiline: bool = False,
+    on_progress: Optional[Callable[[float], None]] = None,
+) -> Tuple[List[str], List[Tuple[int, str]]]:
+    """
+    名前リストを処理する
+
+    進捗は on_progress に 0〜1 の割合で通知する（描画は呼び出し側で行う）。
+    戻り値は (整形結果のリスト, 判定できなかった (行番号, 名前) のリスト)。
+    """
+    format_rule = get_format_rule(target_length)
+
+    formatted_names = []
+    skipped_names = []
+
+    total = len(names)
+    # 描画の往復を抑えるため、進捗の更新は最大100回程度に間引く
+    update_every = max(1, total // 100)
+
+    for i, full_name in enumerate(names):
+        original_name = str(full_name)
+        stripped_name = original_name.strip()
+        if not stripped_name:
+            formatted_names.append("")
+            continue
+
+        # 改行位置の保存とクリーンアップ
+        if use_multiline and "\n" in original_name:
+            # 各文字の直後に改行があるかどうかのフラグを作成
+            # 文字単位で処理するためにリストにする
+            chars = []
+            newlines_after = []  # 各文字のインデックスの後に改行がいくつあるか
+
+            current_newlines = 0
+            for char in original_name:
+                if char == "\n":
+                    if chars:
+                        newlines_after[-1] += 1
+                    else:
+                        # 先頭に改行がある場合
+                        current_newlines += 1
+                else:
+                    chars.append(char)
+                    newlines_after.append(0)
+
+            clean_name = "".join(chars)
+            prefix_newlines = "\n" * current_newlines
+        else:
+            clean_name = stripped_name
+            prefix_newlines = ""
+            newlines_after = []
+
+        surname, given_name = split_name_smart(clean_name, surname_trie)
+
+        if surname is None:
+            skipped_names.append((i + 1, original_name))
+            formatted_names.append(original_name)
+        else:
+            formatted = format_rule(surname, given_name)
+
+            # 改行の再挿入
+            if use_multiline and newlines_after:
+                # 文字列の連結を繰り返さず、部品を集めて最後に一度だけ結合する
+                parts = [prefix_newlines]
+                char_idx = 0
+                for char in formatted:
+                    parts.append(char)
+                    # 空白以外の文字（元の名前に含まれていた文字）の場合、
+                    # 元の文字列でその文字の後にあった改行を挿入
+                    if char != "　" and char != " ":
+                        if char_idx < len(newlines_after):
+                            parts.append("\n" * newlines_after[char_idx])
+                            char_idx += 1
+                formatted = "".join(parts)
+
+            formatted_names.append(formatted)
+
+        if on_progress is not None and (i + 1) % update_every == 0:
+            on_progress((i + 1) / total)
+
+    if on_progress is not None:
+        on_progress(1.0)
+
+    return formatted_names, skipped_names
@@ -1,6 +1,18 @@
+import pandas as pd
 import pytest
+
+from core import (
+    build_surname_trie,
+    column_to_names,
+    dedup_column_names,
+    prepare_surnames,
+    process_names,
+    read_csv_bytes,
+    split_name_smart,
+)
 from pattern5 import format_name_5chars_rule
-from pattern7 import format_name_7chars_rule
+from pattern7 import RULES_7CHARS, format_name_7chars_rule
+
 
 # --- 5字取りのテスト ---
 @pytest.mark.parametrize("surname, given_name, expected", [
@@ -22,15 +34,122 @@ def test_format_5chars(surname, given_name, expected):
 @pytest.mark.parametrize("surname, given_name, expected", [
     ("佐藤", "健", "佐　藤　　　健"),      # (2, 1) -> 1+1+1+3+1=7
     ("佐藤", "二朗", "佐　藤　二　朗"),    # (2, 2) -> 1+1+1+1+1+1+1=7
-    ("高橋", "健二郎", "高橋　健二郎"),    # (2, 3) -> 1+1+1+1+3=7 (佐藤の場合: 佐　藤　健二郎?)
+    ("高橋", "健二郎", "高　橋　健二郎"),  # (2, 3) -> 1+1+1+1+3=7
+    ("高橋", "美智子", "高　橋　美智子"),  # (2, 3) -> 1+1+1+1+3=7
     ("森", "二朗", "森　　　二　朗"),      # (1, 2) -> 1+3+1+1+1=7
     ("勅使河原", "健", "勅使河原　　健"),  # (4, 1) -> 4+2+1=7
-    ("天王寺谷", "二", "天王寺谷　二"),    # (5, 1) -> 5+1+1=7
+    ("天王寺谷", "二", "天王寺谷　　二"),  # (4, 1) -> 4+2+1=7 (天王寺谷は4文字)
+    ("上久木田", "二", "上久木田　　二"),  # (4, 1) -> 4+2+1=7
     ("林", "一郎太", "林　　　一郎太"),    # (1, 3) -> 1+3+3=7
-    ("高橋", "美智子", "高橋　美智子"),    # (2, 3) -> 2+1+3=6? いえ、(2, 3)は 佐　藤　名名名 だったので 高　橋　美智子?
+    ("林", "愛", "林　　　　　愛"),        # (1, 1) -> 1+5+1=7
+    ("林", "一二三四", "林　　一二三四"),  # (1, 4) -> 1+2+4=7
+    ("林", "一二三四五", "林　一二三四五"),  # (1, 5) -> 1+1+5=7
+    ("佐藤", "一二三四", "佐藤　一二三四"),  # (2, 4) -> 2+1+4=7
+    ("長谷川", "健", "長谷川　　　健"),    # (3, 1) -> 3+3+1=7
+    ("長谷川", "二朗", "長谷川　二　朗"),  # (3, 2) -> 3+1+1+1+1=7
+    ("長谷川", "健二郎", "長谷川　健二郎"),  # (3, 3) -> 3+1+3=7
+    ("勅使河原", "二朗", "勅使河原　二朗"),  # (4, 2) -> 4+1+2=7
+    ("勘解由小路", "健", "勘解由小路　健"),  # (5, 1) -> 5+1+1=7
+    ("勅使河原", "健二郎", "勅使河原健二郎"),  # (4, 3) -> 合計7なのでそのまま
 ])
 def test_format_7chars(surname, given_name, expected):
-    # (2, 3) の期待値を再確認: 佐　藤　名名名
-    if len(surname) == 2 and len(given_name) == 3:
-        expected = f"{surname[0]}　{surname[1]}　{given_name}"
     assert format_name_7chars_rule(surname, given_name) == expected
+
+
+@pytest.mark.parametrize("s_len", range(1, 7))
+@pytest.mark.parametrize("g_len", range(1, 7))
+def test_format_7chars_all_lengths(s_len, g_len):
+    # ルールがある組み合わせは7字ちょうど、それ以外はそのまま連結
+    surname, given_name = "佐藤田中村山"[:s_len], "太郎助衛門部"[:g_len]
+    result = format_name_7chars_rule(surname, given_name)
+    if (s_len, g_len) in RULES_7CHARS:
+        assert len(result) == 7
+    else:
+        assert result == surname + given_name
+    assert result.replace("　", "") == surname + given_name
+
+
+# --- CSV読み込みのテスト ---
+@pytest.mark.parametrize("encoding", ["utf-8", "utf-8-sig", "cp932"])
+def test_read_csv_bytes(encoding):
+    # ASCIIのヘッダーでも、名前の列の文字コードで判定されること
+    content = "ID,name\n1,田中太郎\n2,髙橋健\n".encode(encoding)
+    df = read_csv_bytes(content)
+    assert list(df.columns) == ["ID", "name"]
+    assert column_to_names(df["name"]) == ["田中太郎", "髙橋健"]
+
+
+def test_read_csv_bytes_duplicate_columns():
+    # 重複した列名は Cエンジンと同じく「氏名.1」のように区別される
+    df = read_csv_bytes("氏名,氏名,氏名.1\n田中太郎,佐藤健,林愛\n".encode())
+    assert list(df.columns) == ["氏名", "氏名.1", "氏名.1.1"]
+    assert column_to_names(df["氏名.1"]) == ["佐藤健"]
+
+
+@pytest.mark.parametrize("names, expected", [
+    (["氏名", "ID", "氏名", "氏名"], ["氏名", "ID", "氏名.1", "氏名.2"]),
+    (["a", "a", "a.1"], ["a", "a.1", "a.1.1"]),  # 付けた名前とも衝突しない
+    (["a", "b"], ["a", "b"]),
+])
+def test_dedup_column_names(names, expected):
+    assert dedup_column_names(names) == expected
+
+
+# --- 表の列の変換テスト ---
+@pytest.mark.parametrize("column, expected", [
+    (pd.Series(["田中太郎", None, "佐藤健"]), ["田中太郎", "", "佐藤健"]),
+    (pd.Series([1, None, 3], dtype="int64[pyarrow]"), ["1", "", "3"]),
+    (pd.Series([None, None], dtype="string[pyarrow]"), ["", ""]),
+])
+def test_column_to_names(column, expected):
+    # 空セルは空文字として行の位置を保ち、整数列は "1.0" にならない
+    assert column_to_names(column) == expected
+
+
+# --- 苗字判定のテスト ---
+SURNAMES = prepare_surnames(["田中", "田", "佐藤", "小", "小比類巻", "田中"])
+
+
+@pytest.fixture(scope="module")
+def surname_trie():
+    # トライ木はモジュール内のテストで共有し、一度だけ構築する
+    return build_surname_trie(SURNAMES)
+
+
+def test_prepare_surnames():
+    # 重複を除き、長い順（同じ長さは辞書順）
+    assert SURNAMES == ["小比類巻", "佐藤", "田中", "小", "田"]
+
+
+@pytest.mark.parametrize("full_name, expected", [
+    ("田中太郎", ("田中", "太郎")),      # 「田」より「田中」を優先
+    ("田村一郎", ("田", "村一郎")),      # 短い苗字のみ一致
+    ("小比類巻健", ("小比類巻", "健")),  # 4文字の苗字
+    ("佐藤", ("佐藤", "")),              # 名前なし
+    ("山田花子", (None, None)),          # 判定できない
+    ("", (None, None)),
+])
+def test_split_name_smart(surname_trie, full_name, expected):
+    assert split_name_smart(full_name, surname_trie) == expected
+
+
+# --- 一括処理のテスト ---
+def test_process_names(surname_trie):
+    progress = []
+    formatted, skipped = process_names(
+        ["田中太郎", "", "山田花子", " 佐藤健 "],
+        surname_trie,
+        5,
+        on_progress=progress.append,
+    )
+    assert formatted == ["田中　太郎", "", "山田花子", "佐藤　　健"]
+    assert skipped == [(3, "山田花子")]
+    assert progress[-1] == 1.0
+
+
+def test_process_names_multiline(surname_trie):
+    formatted, skipped = process_names(
+        ["\n田中\n太郎"], surname_trie, 7, use_multiline=True
+    )
+    assert formatted == ["\n田　中\n　太　郎"]
+    assert skipped == []